@@ -110,33 +110,55 @@ async def get_tag_by_id(session: AsyncSession, tag_id: UUID) -> Tag:
 
 
 async def get_or_create_tag(session: AsyncSession, name: str, slug: str) -> Tag:
-    """获取或创建标签 (用于同步 MDX 标签)"""
-    from sqlalchemy import or_
+    """获取或创建标签 (用于同步 MDX 标签)
 
-    # 1. 优先通过 Slug 或 Name 寻找现有标签
-    # 这是关键：必须同时检查两者，特别是 Slug，因为它是唯一索引且由 Name 生成
-    stmt = select(Tag).where(or_(Tag.slug == slug, Tag.name == name))
-    result = await session.exec(stmt)
-    tag = result.one_or_none()
+    命中和未命中都只需一次数据库往返：
+    WITH inserted AS (INSERT ... ON CONFLICT DO NOTHING RETURNING *)
+    SELECT * FROM inserted UNION ALL SELECT * FROM posts_tag WHERE slug = ... OR name = ...
+    name 和 slug 都有唯一约束，任一冲突都不会插入，此时由后半段查出现有标签。
 
-    if not tag:
-        tag = Tag(name=name, slug=slug)
-        session.add(tag)
-        try:
-            await session.flush()
-        except Exception as e:
-            # 防御性处理：如果在并发或极端情况下 flush 失败，回退并重新查询
-            await session.rollback()
-            stmt = select(Tag).where(or_(Tag.slug == slug, Tag.name == name))
-            result = await session.exec(stmt)
-            tag = result.one_or_none()
-
-            if not tag:
-                from app.core.exceptions import DatabaseError
-
-                raise DatabaseError(
-                    message=f"无法创建或获取标签: '{name}' (slug: {slug})。可能是由于数据库约束冲突或数据非法。",
-                ) from e
+    并发插入同名标签时 ON CONFLICT 会等待对方事务提交后放弃插入，
+    但后半段使用语句开始时的快照，看不到对方刚提交的行，结果为空；
+    这种情况下再单独查询一次（新语句取新快照）即可拿到该标签。
+    """
+    from app.core.exceptions import DatabaseError
+    from sqlalchemy import or_, union_all
+    from sqlalchemy.dialects.postgresql import insert
+    from sqlalchemy.exc import SQLAlchemyError
+
+    table = Tag.__table__
+    # 先构造模型实例，复用 id / created_at 等字段的 default_factory
+    values = Tag(name=name, slug=slug).model_dump()
+
+    inserted = (
+        insert(table)
+        .values(**values)
+        .on_conflict_do_nothing()
+        .returning(*table.c)
+        .cte("inserted")
+    )
+    # 同一语句内后半段看不到 inserted 刚写入的行：插入成功时只有前半段有结果，
+    # 冲突时只有后半段有结果（name、slug 分别命中两个标签时取其一）
+    existing = select(*table.c).where(or_(table.c.slug == slug, table.c.name == name))
+    stmt = select(Tag).from_statement(union_all(select(*inserted.c), existing).limit(1))
+
+    try:
+        result = await session.exec(stmt)  # type: ignore
+        tag = result.scalars().one_or_none()
+    except SQLAlchemyError as e:
+        raise DatabaseError(
+            message=f"无法创建或获取标签: '{name}' (slug: {slug})。可能是由于数据库约束冲突或数据非法。",
+        ) from e
+
+    if tag is None:
+        # 并发插入：冲突行由其他事务在本语句开始后提交，重新查询
+        retry = select(Tag).where(or_(Tag.slug == slug, Tag.name == name)).limit(1)
+        tag = (await session.exec(retry)).first()
+
+    if tag is None:
+        raise DatabaseError(
+            message=f"无法创建或获取标签: '{name}' (slug: {slug})。",
+        )
     return tag
 
 
@@ -34,7 +34,8 @@ router = APIRouter(tags=["Posts - Articles"])
     description=PREVIEW_POST_DOC,
 )
 async def preview_post(request: PostPreviewRequest):
-    return await utils.PostProcessor(request.content_mdx).process()
+    # 预览内容几乎每次都不同，只查缓存不写入
+    return await utils.PostProcessor(request.content_mdx).process(cache=False)
 
 
 # ========================================
@@ -7,6 +7,13 @@ AST 生成器
 import re
 from typing import Any, Dict, List, Optional
 
+from .content_parser import unique_heading_slug
+
+_MATH_BLOCK_RE = re.compile(r'<div class="math-block">(.*?)</div>', re.DOTALL)
+_MATH_INLINE_RE = re.compile(r'<span class="math-inline">(.*?)</span>')
+_MERMAID_RE = re.compile(r'<div class="mermaid">\s*(.*?)\s*</div>', re.DOTALL)
+_COMPONENT_RE = re.compile(r'data-component="([^"]+)"')
+
 
 class ASTGenerator:
     """AST 生成器类"""
@@ -217,30 +224,8 @@ class ASTGenerator:
         return ""
 
     def _generate_unique_slug(self, title: str, slug_counter: Dict[str, int]) -> str:
-        """生成唯一 slug（与 TOC 生成逻辑保持一致）
-
-        Args:
-            title: 标题文本
-            slug_counter: slug 计数器
-
-        Returns:
-            唯一的 slug
-        """
-        import re
-
-        base_slug = re.sub(r"[^\w\s-]", "", title).strip().lower().replace(" ", "-")
-        base_slug = re.sub(r"-+", "-", base_slug).strip("-")
-
-        if not base_slug:
-            base_slug = "heading"
-
-        if base_slug not in slug_counter:
-            slug_counter[base_slug] = 1
-            return base_slug
-        else:
-            count = slug_counter[base_slug]
-            slug_counter[base_slug] += 1
-            return f"{base_slug}-{count}"
+        """生成唯一 slug（与 TOC 共用 content_parser.unique_heading_slug）"""
+        return unique_heading_slug(title, slug_counter)
 
     def _create_node_from_token(
         self, token, slug_counter: Dict[str, int]
@@ -342,9 +327,7 @@ class ASTGenerator:
             # 检测数学公式（块级）
             if 'class="math-block"' in content:
                 # 提取 LaTeX
-                latex = re.search(
-                    r'<div class="math-block">(.*?)</div>', content, re.DOTALL
-                )
+                latex = _MATH_BLOCK_RE.search(content)
                 if latex:
                     return {
                         "type": "math",
@@ -365,7 +348,7 @@ class ASTGenerator:
             # 检测数学公式（行内）- 完整标签
             if 'class="math-inline"' in content:
                 # 提取 LaTeX
-                latex = re.search(r'<span class="math-inline">(.*?)</span>', content)
+                latex = _MATH_INLINE_RE.search(content)
                 if latex:
                     return {
                         "type": "math",
@@ -375,16 +358,14 @@ class ASTGenerator:
 
             # 检测 Mermaid 图表
             if 'class="mermaid"' in content:
-                mermaid_code = re.search(
-                    r'<div class="mermaid">\s*(.*?)\s*</div>', content, re.DOTALL
-                )
+                mermaid_code = _MERMAID_RE.search(content)
                 if mermaid_code:
                     return {"type": "mermaid", "value": mermaid_code.group(1).strip()}
 
             # 检测自定义组件
             if "data-component=" in content:
                 # 提取组件类型和属性
-                component_match = re.search(r'data-component="([^"]+)"', content)
+                component_match = _COMPONENT_RE.search(content)
                 if component_match:
                     component_name = component_match.group(1)
                     # 提取 props（简化处理）
@@ -8,6 +8,22 @@ import math
 import re
 from typing import Any, Dict, List
 
+_CHINESE_CHAR_RE = re.compile(r"[\u4e00-\u9fa5]")
+# 非中文的连续单词字符：中文字符作为分隔，等价于先把中文替换为空格再数 \w+
+_NON_CHINESE_WORD_RE = re.compile(r"[^\W\u4e00-\u9fa5]+")
+_CODE_BLOCK_RE = re.compile(r"```.*?```", re.DOTALL)
+_HEADING_MARK_RE = re.compile(r"^#+\s+", re.MULTILINE)
+_LINK_RE = re.compile(r"\[([^\]]+)\]\([^\)]+\)")
+_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\([^\)]+\)")
+_MATH_BLOCK_RE = re.compile(r"\$\$.*?\$\$", re.DOTALL)
+_MATH_INLINE_RE = re.compile(r"\$[^$]+\$")
+_EMPHASIS_RE = re.compile(r"[*_~`]")
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+# 由空白和 HTML 标签组成的连续片段：一次扫描同时完成去标签和空白归一化
+_TAG_OR_SPACE_RUN_RE = re.compile(r"(?:\s|<[^>]+>)+")
+_SLUG_INVALID_RE = re.compile(r"[^\w\s-]")
+_HYPHENS_RE = re.compile(r"-+")
+
 
 def generate_toc(content: str) -> List[Dict[str, Any]]:
     """生成目录
@@ -20,21 +36,35 @@ def generate_toc(content: str) -> List[Dict[str, Any]]:
     """
     toc = []
     slug_counter = {}
-    lines = content.split("\n")
-    in_code_block = False
+    # 当前所在代码块的围栏标记（``` 或 ~~~），None 表示不在代码块中
+    fence = None
+
+    # 单次逐行扫描：只用字符串操作，不对代码块内容做正则匹配
+    for line in content.split("\n"):
+        stripped = line.lstrip()
+        if stripped.startswith(("```", "~~~")):
+            marker = stripped[:3]
+            if fence is None:
+                fence = marker
+            elif marker == fence:
+                fence = None
+            continue
+
+        if fence is not None or not line.startswith("#"):
+            continue
+
+        level = len(line) - len(line.lstrip("#"))
+        rest = line[level:]
+        # 标题需要 1-6 个 #，且 # 后紧跟空白
+        if level > 6 or not rest[:1].isspace():
+            continue
 
-    for line in lines:
-        if line.startswith("```"):
-            in_code_block = not in_code_block
+        title = rest.strip()
+        if not title:
             continue
 
-        if not in_code_block:
-            match = re.match(r"^(#{1,6})\s+(.+)$", line)
-            if match:
-                level = len(match.group(1))
-                title = match.group(2).strip()
-                slug = _generate_unique_slug(title, slug_counter)
-                toc.append({"id": slug, "title": title, "level": level})
+        slug = unique_heading_slug(title, slug_counter)
+        toc.append({"id": slug, "title": title, "level": level})
 
     return toc
 
@@ -48,9 +78,8 @@ def calculate_reading_time(content: str) -> int:
     Returns:
         预计阅读时间（分钟）
     """
-    chinese_chars = len(re.findall(r"[\u4e00-\u9fa5]", content))
-    remaining_text = re.sub(r"[\u4e00-\u9fa5]", " ", content)
-    english_words = len(re.findall(r"\b\w+\b", remaining_text))
+    chinese_chars = len(_CHINESE_CHAR_RE.findall(content))
+    english_words = len(_NON_CHINESE_WORD_RE.findall(content))
     total_count = chinese_chars + english_words
     minutes = math.ceil(total_count / 300)
     return max(1, minutes)
@@ -66,37 +95,79 @@ def generate_excerpt(markdown_content: str, length: int = 200) -> str:
     Returns:
         摘要文本
     """
-    content = re.sub(r"```.*?```", "", markdown_content, flags=re.DOTALL)
-    content = re.sub(r"^#+\s+", "", content, flags=re.MULTILINE)
-    content = re.sub(r"\[([^\]]+)\]\([^\)]+\)", r"\1", content)
-    content = re.sub(r"!\[([^\]]*)\]\([^\)]+\)", "", content)
-    content = re.sub(r"\$\$.*?\$\$", "", content, flags=re.DOTALL)
-    content = re.sub(r"\$[^$]+\$", "", content)
-    content = re.sub(r"[*_~`]", "", content)
-    # 移除 HTML 标签
-    content = re.sub(r"<[^>]+>", "", content)
-    content = re.sub(r"\s+", " ", content).strip()
+    content = _CODE_BLOCK_RE.sub("", markdown_content)
+    content = _HEADING_MARK_RE.sub("", content)
+    content = _LINK_RE.sub(r"\1", content)
+    content = _IMAGE_RE.sub("", content)
+    content = _MATH_BLOCK_RE.sub("", content)
+    content = _MATH_INLINE_RE.sub("", content)
+    content = _EMPHASIS_RE.sub("", content)
+    # 移除 HTML 标签并把连续空白压缩为一个空格
+    # 逐段扫描，可见文本超过摘要长度后立即停止，不再处理文章剩余部分
+    # （以上各步的代码块、公式等可能跨越多行，仍需处理全文）
+    parts: List[str] = []
+    size = 0
+    pos = 0
+    for match in _TAG_OR_SPACE_RUN_RE.finditer(content):
+        text = content[pos : match.start()]
+        parts.append(text)
+        size += len(text)
+        if size > length:
+            break
+        # 开头的空白直接丢弃（相当于 lstrip）
+        if size and _collapse_tag_or_space(match):
+            parts.append(" ")
+            size += 1
+        pos = match.end()
+    else:
+        parts.append(content[pos:])
+
+    # 片段之间只会插入单个空格，末尾最多多出一个
+    content = "".join(parts).rstrip(" ")
 
     if len(content) <= length:
         return content
     return content[:length] + "..."
 
 
-def _generate_unique_slug(title: str, slug_counter: dict) -> str:
-    """生成唯一 slug
+def _collapse_tag_or_space(match: re.Match) -> str:
+    """空白/标签片段的替换：去掉标签后还剩空白则为一个空格，否则为空
+
+    与"先删除所有标签，再把连续空白压缩为一个空格"的结果相同。
+    """
+    run = match.group()
+    if "<" not in run:
+        return " "
+    return " " if _HTML_TAG_RE.sub("", run) else ""
+
+
+def heading_slug(title: str) -> str:
+    """把标题文本转为 slug
+
+    TOC、AST 和 Markdown 渲染器生成标题 id 时都使用这里的规则，
+    保证目录链接能对应到正文中的标题。
 
     Args:
         title: 标题文本
-        slug_counter: slug 计数器
 
     Returns:
-        唯一的 slug
+        slug；标题中没有可用字符时为 "heading"
     """
-    base_slug = re.sub(r"[^\w\s-]", "", title).strip().lower().replace(" ", "-")
-    base_slug = re.sub(r"-+", "-", base_slug).strip("-")
+    base_slug = _SLUG_INVALID_RE.sub("", title).strip().lower().replace(" ", "-")
+    return _HYPHENS_RE.sub("-", base_slug).strip("-") or "heading"
 
-    if not base_slug:
-        base_slug = "heading"
+
+def unique_heading_slug(title: str, slug_counter: Dict[str, int]) -> str:
+    """生成文档内唯一的标题 slug，重复时依次追加 -1、-2 ...
+
+    Args:
+        title: 标题文本
+        slug_counter: slug 计数器（同一文档内共享）
+
+    Returns:
+        唯一的 slug
+    """
+    base_slug = heading_slug(title)
 
     if base_slug not in slug_counter:
         slug_counter[base_slug] = 1
@@ -4,8 +4,9 @@
 提供 slug 生成、标签同步等辅助功能
 """
 
-import random
-import string
+import base64
+import re
+import secrets
 from typing import List
 
 from app.posts.model import Post, PostTagLink
@@ -13,6 +14,21 @@ from slugify import slugify as python_slugify
 from sqlalchemy import delete
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+# 只含 ASCII 字母、数字和空格的标题：python-slugify 的结果就是
+# "小写后按空白拆分再用 - 连接"，无需经过实体解码、转写等完整流程
+_SIMPLE_TITLE_RE = re.compile(r"[A-Za-z0-9 ]+")
+
+
+def _slugify(text: str) -> str:
+    """生成 slug，结果与 python-slugify 的默认行为一致
+
+    简单 ASCII 文本走快速路径；中文、标点、HTML 实体等交给 python-slugify
+    （中文会被转写为拼音，不能简单地做 Unicode 规范化后删除非 ASCII 字符）。
+    """
+    if _SIMPLE_TITLE_RE.fullmatch(text):
+        return "-".join(text.lower().split())
+    return python_slugify(text)
+
 
 def generate_slug_with_random_suffix(title: str, random_length: int = 6) -> str:
     """生成带随机后缀的 slug
@@ -24,12 +40,14 @@ def generate_slug_with_random_suffix(title: str, random_length: int = 6) -> str:
     Returns:
         带随机后缀的 slug
     """
-    base_slug = python_slugify(title)
+    base_slug = _slugify(title)
     if not base_slug:
         base_slug = "post"
-    random_suffix = "".join(
-        random.choices(string.ascii_lowercase + string.digits, k=random_length)
-    )
+    # 一次取够随机字节再做 base32 编码（字符集 a-z2-7，每字符 5 bit），
+    # 代替逐字符 random.choices；熵与原来的 [a-z0-9] 相当
+    random_bytes = secrets.token_bytes((random_length * 5 + 7) // 8)
+    random_suffix = base64.b32encode(random_bytes).decode("ascii").lower()
+    random_suffix = random_suffix[:random_length]
     return f"{base_slug}-{random_suffix}"
 
 
@@ -61,7 +79,7 @@ async def sync_post_tags(
             name = name[:47] + "..."
 
         # 生成slug并确保不超过50字符
-        tag_slug = python_slugify(name)
+        tag_slug = _slugify(name)
         if len(tag_slug) > 50:
             tag_slug = tag_slug[:50]
 
@@ -6,6 +6,18 @@ Markdown 渲染器设置
 
 import re
 
+from .content_parser import unique_heading_slug
+
+# JSX/TSX 语法特征（任一命中即视为 JSX），合并为一个预编译正则
+_JSX_RE = re.compile(
+    r"style=\{\{"  # style={{...}}
+    r"|onClick=\{"  # onClick={...}
+    r"|onChange=\{"  # onChange={...}
+    r"|onSubmit=\{"  # onSubmit={...}
+    r"|className="  # className (JSX 特有，HTML 用 class)
+    r"|=\{[^}]+\}"  # 任何属性={...}
+)
+
 
 def setup_markdown_renderer(md):
     """设置 markdown-it 的自定义渲染规则
@@ -112,7 +124,7 @@ def _setup_heading_renderer(md):
             if inline_token.type == "inline" and inline_token.content:
                 title = inline_token.content
                 # 生成 slug
-                slug = _generate_unique_slug(title, slug_counter)
+                slug = unique_heading_slug(title, slug_counter)
                 # 添加 id 属性
                 token.attrSet("id", slug)
 
@@ -132,29 +144,10 @@ def _setup_heading_renderer(md):
 
 def _is_jsx_syntax(content: str) -> bool:
     """检测是否是 JSX/TSX 语法"""
-    jsx_patterns = [
-        r"style=\{\{",  # style={{...}}
-        r"onClick=\{",  # onClick={...}
-        r"onChange=\{",  # onChange={...}
-        r"onSubmit=\{",  # onSubmit={...}
-        r"className=",  # className (JSX 特有，HTML 用 class)
-        r"=\{[^}]+\}",  # 任何属性={...}
-    ]
-    return any(re.search(pattern, content) for pattern in jsx_patterns)
-
-
-def _generate_unique_slug(title: str, slug_counter: dict) -> str:
-    """生成唯一 slug"""
-    base_slug = re.sub(r"[^\w\s-]", "", title).strip().lower().replace(" ", "-")
-    base_slug = re.sub(r"-+", "-", base_slug).strip("-")
-
-    if not base_slug:
-        base_slug = "heading"
-
-    if base_slug not in slug_counter:
-        slug_counter[base_slug] = 1
-        return base_slug
-    else:
-        count = slug_counter[base_slug]
-        slug_counter[base_slug] += 1
-        return f"{base_slug}-{count}"
+    # 快速预判：除 className= 外，所有特征都包含 "={"；
+    # 普通 Markdown / HTML 片段基本都不含这两者，无需进入正则
+    if "className=" in content:
+        return True
+    if "={" not in content:
+        return False
+    return _JSX_RE.search(content) is not None
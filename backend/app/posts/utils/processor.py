@@ -4,23 +4,319 @@
 负责处理 Markdown 内容，生成 HTML、AST、TOC 等
 """
 
+import functools
+import hashlib
+import pickle
 import re
-from typing import Any, Dict, List
-
-import frontmatter
-from markdown_it import MarkdownIt
-from mdit_py_plugins.deflist import deflist_plugin
-from mdit_py_plugins.footnote import footnote_plugin
-from mdit_py_plugins.tasklists import tasklists_plugin
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
 
 from .ast_generator import ASTGenerator
 from .content_parser import calculate_reading_time, generate_excerpt, generate_toc
-from .markdown_renderer import setup_markdown_renderer
+from .markdown_renderer import _is_jsx_syntax, setup_markdown_renderer
+
+# 处理结果缓存版本号：处理流水线的输出格式变化时递增，避免命中旧结果
+_CACHE_VERSION = b"2"
+_CACHE_MAXSIZE = 2000
+# 缓存条目总大小上限（快照 + 正文 + 摘要，单位为字节/字符的近似值）
+_CACHE_MAXBYTES = 64 * 1024 * 1024
+
+_CODE_BLOCK_RE = re.compile(r"```.*?```", re.DOTALL)
+_CODE_PLACEHOLDER_RE = re.compile(r"<!--CODE_BLOCK_(\d+)-->")
+_MATH_BLOCK_RE = re.compile(r"\$\$(.*?)\$\$", re.DOTALL)
+_MATH_INLINE_RE = re.compile(r"(?<!\\)\$(\S[^$\n]*?\S)\$")
+_LATEX_HINT_RE = re.compile(r"[a-zA-Z\\]")
+_IMAGE_RE = re.compile(r"!\[(.*?)\]\((.*?)\)")
+
+# 简单 Frontmatter 快速解析（见 _parse_simple_frontmatter）
+_FM_KEY_RE = re.compile(r"([A-Za-z_][A-Za-z0-9_-]*):(?: +(.*))?")
+_FM_ITEM_RE = re.compile(r"( *)- +(.*)")
+_LEADING_SPACE_RE = re.compile(r"\s*")
+# YAML 会把这些纯量解析为 bool / null 等非字符串值
+_FM_RESERVED_WORDS = frozenset(
+    ["true", "false", "yes", "no", "on", "off", "null", "~", "=", "<<"]
+)
+# 以这些字符开头的纯量有特殊含义（数字、日期、引号、锚点、流式集合等）
+_FM_SPECIAL_START = frozenset("0123456789+-.~?:,[]{}#&*!|>'\"%@`")
+
+
+@dataclass(frozen=True, slots=True)
+class ProcessedResult:
+    """一次纯文本处理的结果（不含图片上传等副作用），用于缓存
+
+    metadata / content_ast / toc 是可变的 dict / list，以 pickle 快照
+    （bytes）保存，使实例整体不可变，可在多个请求间安全共享；
+    每次取出都反序列化出一份新对象，比 deepcopy 快得多。
+    快照只在进程内生成和读取，不接收外部数据。
+    """
+
+    content_mdx: str
+    reading_time: int
+    excerpt: str
+    snapshot: bytes  # pickle((metadata, content_ast, toc))
+
+    def restore(self) -> tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]:
+        """反序列化快照，返回新的 (metadata, content_ast, toc)"""
+        return pickle.loads(self.snapshot)
+
+
+class _ProcessCache:
+    """按内容哈希缓存处理结果的 LRU 缓存，并统计命中情况
+
+    同时限制条目数和条目总大小：单篇超长文章的 AST 快照可能很大，
+    只按条目数限制时内存占用没有上界。
+    """
+
+    def __init__(self, maxsize: int, maxbytes: int):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[bytes, ProcessedResult] = OrderedDict()
+
+    @staticmethod
+    def _entry_size(result: ProcessedResult) -> int:
+        return len(result.snapshot) + len(result.content_mdx) + len(result.excerpt)
+
+    def get(self, key: bytes) -> Optional[ProcessedResult]:
+        result = self._data.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key: bytes, result: ProcessedResult) -> None:
+        size = self._entry_size(result)
+        if size > self.maxbytes:
+            return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.nbytes -= self._entry_size(old)
+        self._data[key] = result
+        self.nbytes += size
+        while len(self._data) > self.maxsize or self.nbytes > self.maxbytes:
+            _, evicted = self._data.popitem(last=False)
+            self.nbytes -= self._entry_size(evicted)
+
+    def info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": self.nbytes,
+            "maxbytes": self.maxbytes,
+        }
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+
+_process_cache = _ProcessCache(_CACHE_MAXSIZE, _CACHE_MAXBYTES)
+
+
+@functools.cache
+def _get_markdown_parser():
+    """获取配置好的 markdown-it 解析器（进程内单例，首次调用时创建）
+
+    markdown-it 及其插件在这里才导入：只用到查询构建等函数的调用方
+    （例如 query_builder 的单元测试）无需加载整套 Markdown 依赖。
+
+    PostProcessor 只调用 parse()，解析状态保存在每次调用自己的 state 中，
+    可以安全复用同一个实例；不要在共享实例上调用 render()，
+    自定义标题渲染规则的 slug 计数器会在多次渲染之间累积。
+    """
+    from markdown_it import MarkdownIt
+    from mdit_py_plugins.deflist import deflist_plugin
+    from mdit_py_plugins.footnote import footnote_plugin
+    from mdit_py_plugins.tasklists import tasklists_plugin
+
+    md = (
+        MarkdownIt("commonmark", {"html": True, "linkify": True, "typographer": True})
+        .enable(["table", "strikethrough"])
+        .use(footnote_plugin)
+        .use(deflist_plugin)
+        .use(tasklists_plugin)
+    )
+
+    # 设置自定义渲染规则（用于 AST 生成）
+    setup_markdown_renderer(md)
+    return md
+
+
+def _content_key(raw_content: str) -> bytes:
+    """计算缓存键：原始内容的 blake2b 摘要（附带版本号）"""
+    return hashlib.blake2b(
+        raw_content.encode("utf-8"), digest_size=16, salt=_CACHE_VERSION
+    ).digest()
+
+
+def _simple_scalar(value: str) -> Optional[str]:
+    """判断纯量是否会被 YAML 原样解析为字符串，是则返回该字符串，否则返回 None"""
+    if (
+        not value
+        or value[0] in _FM_SPECIAL_START
+        or value.lower() in _FM_RESERVED_WORDS
+        or ": " in value
+        or " #" in value
+        or value.endswith(":")
+        or not value.isprintable()
+    ):
+        return None
+    return value
+
+
+def _parse_simple_frontmatter(text: str) -> Optional[Dict[str, Any]]:
+    """手写的 Frontmatter 快速解析，只覆盖最常见的写法
+
+    支持的格式：
+        key: value        # 普通字符串
+        key:              # 后面跟列表
+          - item
+        key:              # 后面没有列表时为 None
+
+    结果与 yaml.safe_load 完全一致；遇到任何可能被 YAML 解析成非字符串的值
+    （数字、日期、布尔、引号、注释、多行文本、嵌套结构等）时返回 None，
+    由调用方回退到完整的 YAML 解析器。
+    """
+    result: Dict[str, Any] = {}
+    list_key: Optional[str] = None  # 当前可以接收列表项的键
+    list_indent: Optional[int] = None
+
+    for line in text.split("\n"):
+        line = line.rstrip("\r")
+        if not line.strip(" "):
+            continue
+        if not line.strip():
+            # 含制表符、全角空格等的空白行：PyYAML 可能续接上一个标量或报错
+            return None
+
+        item = _FM_ITEM_RE.fullmatch(line)
+        if item:
+            if list_key is None:
+                return None
+            indent = len(item.group(1))
+            if list_indent is None:
+                list_indent = indent
+            elif indent != list_indent:
+                return None
+            value = _simple_scalar(item.group(2).rstrip(" "))
+            if value is None:
+                return None
+            if result[list_key] is None:
+                result[list_key] = []
+            result[list_key].append(value)
+            continue
+
+        entry = _FM_KEY_RE.fullmatch(line)
+        if not entry or entry.group(1).lower() in _FM_RESERVED_WORDS:
+            return None
+        key = entry.group(1)
+        raw_value = (entry.group(2) or "").rstrip(" ")
+        list_indent = None
+        if raw_value:
+            value = _simple_scalar(raw_value)
+            if value is None:
+                return None
+            result[key] = value
+            list_key = None
+        else:
+            result[key] = None
+            list_key = key
+
+    return result
+
+
+def _split_yaml_frontmatter(text: str) -> Optional[tuple[str, str]]:
+    """用 str.find 定位 --- 分隔行，返回 (frontmatter, 正文)
+
+    只处理最常见的形式：开头和结尾都是单独一行的 ---（允许行尾空白）。
+    其他写法（如 ---- 或分隔行后紧跟其他字符）返回 None，交给 python-frontmatter。
+    """
+    first_nl = text.find("\n")
+    if first_nl == -1 or text[3:first_nl].strip():
+        return None
+
+    # 与 python-frontmatter 的分隔正则 ^-{3,}\s*$ 一致：开头分隔行会吞掉后面
+    # 仅含空白的行，Frontmatter 从这段空白中最后一个换行处开始
+    start = text.rfind("\n", first_nl, _LEADING_SPACE_RE.match(text, 3).end())
+
+    end = text.find("\n---", start)
+    if end == -1:
+        return None
+    line_end = text.find("\n", end + 1)
+    if line_end == -1:
+        line_end = len(text)
+    if text[end + 4 : line_end].strip():
+        return None
+
+    # 与 python-frontmatter 一致，保留结束分隔行前的换行：
+    # 位于末尾的块标量（| 或 >）依赖它得到结尾的 "\n"
+    return text[start : end + 1], text[line_end + 1 :]
+
+
+def _parse_frontmatter(raw_content: str) -> tuple[Dict[str, Any], str]:
+    """拆分 Frontmatter 和正文，返回 (metadata, content)
+
+    结果与 python-frontmatter 的 loads() 相同。常见情况走快速路径：
+    - 没有 Frontmatter：一次 startswith 判断后直接返回
+    - 标准的 --- 分隔 YAML：str.find 定位分隔行，YAML 先尝试快速解析
+
+    含 \r 的文本（python-frontmatter 会做换行符替换）以及其他少见写法
+    直接交给 python-frontmatter 处理。
+    """
+    if "\r" not in raw_content:
+        text = raw_content.strip()
+        # python-frontmatter 只识别以 ---（YAML）、+++（TOML）、{ / }（JSON）开头的文本
+        if not text.startswith(("---", "+++", "{", "}")):
+            return {}, text
+
+        parts = _split_yaml_frontmatter(text) if text.startswith("---") else None
+        if parts is not None:
+            fm, content = parts
+            metadata = _parse_simple_frontmatter(fm)
+            if metadata is None:
+                metadata = _load_yaml_frontmatter(fm)
+            return metadata, content.strip()
+
+    import frontmatter
+
+    post = frontmatter.loads(raw_content)
+    return post.metadata, post.content
+
+
+def _load_yaml_frontmatter(fm: str) -> Dict[str, Any]:
+    """使用 python-frontmatter 的 YAML 解析器（SafeLoader）解析 Frontmatter"""
+    import frontmatter
+
+    data = frontmatter.YAMLHandler().load(fm)
+    return data if isinstance(data, dict) else {}
 
 
 class PostProcessor:
     """MDX 文章处理器"""
 
+    # 固定属性集合：每次请求都会创建实例，__slots__ 省去实例 __dict__
+    __slots__ = (
+        "raw_content",
+        "mdx_path",
+        "session",
+        "metadata",
+        "content_mdx",
+        "content_ast",
+        "toc",
+        "reading_time",
+        "excerpt",
+        "ast_generator",
+    )
+
     def __init__(self, raw_content: str, mdx_path: str | None = None, session=None):
         self.raw_content = raw_content
         self.mdx_path = mdx_path
@@ -32,20 +328,6 @@ class PostProcessor:
         self.reading_time: int = 0
         self.excerpt: str = ""
 
-        # 初始化 markdown-it
-        self.md = (
-            MarkdownIt(
-                "commonmark", {"html": True, "linkify": True, "typographer": True}
-            )
-            .enable(["table", "strikethrough"])
-            .use(footnote_plugin)
-            .use(deflist_plugin)
-            .use(tasklists_plugin)
-        )
-
-        # 设置自定义渲染规则（用于 AST 生成）
-        setup_markdown_renderer(self.md)
-
         # 初始化 AST 生成器
         self.ast_generator = ASTGenerator()
 
@@ -53,12 +335,45 @@ class PostProcessor:
         """检测整个文档是否包含 JSX/TSX 组件"""
         return self._is_jsx_syntax(self.content_mdx)
 
-    async def process(self) -> "PostProcessor":
-        """执行完整处理流水线"""
+    @staticmethod
+    def cache_info() -> Dict[str, int]:
+        """处理结果缓存的统计信息（hits / misses / size / maxsize / bytes / maxbytes）"""
+        return _process_cache.info()
+
+    @staticmethod
+    def cache_clear() -> None:
+        """清空处理结果缓存"""
+        _process_cache.clear()
+
+    async def process(self, *, cache: bool = True) -> "PostProcessor":
+        """执行完整处理流水线
+
+        不涉及图片上传（未同时提供 session 和 mdx_path）时，处理结果只取决于
+        原始内容，按内容哈希缓存，相同内容直接复用上一次的结果。
+
+        实际会命中缓存的场景：
+        - 编辑器保存时总会带上完整正文，只修改状态、分类、封面等元数据后
+          再次保存（PATCH），正文未变，直接复用上一次创建/更新的结果
+        - 对已保存的正文调用 /preview
+
+        Git 同步会同时提供 session 和 source_path（需要上传正文图片），
+        不读也不写缓存。
+
+        Args:
+            cache: 是否把本次结果写入缓存。内容基本不会重复出现的调用方
+                （实时预览、backfill 等一次性批处理）应传 False：
+                仍会查找缓存，但省掉一次快照序列化，也不占用缓存容量。
+        """
+        cache_key = None
+        if not (self.session and self.mdx_path):
+            cache_key = _content_key(self.raw_content)
+            cached = _process_cache.get(cache_key)
+            if cached is not None:
+                self._load_result(cached)
+                return self
+
         # 1. 拆分 Frontmatter 和正文
-        post_data = frontmatter.loads(self.raw_content)
-        self.metadata = post_data.metadata
-        self.content_mdx = post_data.content
+        self.metadata, self.content_mdx = _parse_frontmatter(self.raw_content)
 
         # 1.5 处理正文中的本地图片并上传 (仅在提供 session 和 mdx_path 时)
         if self.session and self.mdx_path:
@@ -74,14 +389,36 @@ class PostProcessor:
         processed_md = self._preprocess_math(self.content_mdx)
 
         # 5. 生成 AST（基于处理后的 Markdown）
-        tokens = self.md.parse(processed_md)
+        tokens = _get_markdown_parser().parse(processed_md)
         self.content_ast = self.ast_generator.generate(tokens)
 
         # 6. 生成摘要（基于原始 Markdown）
         self.excerpt = generate_excerpt(self.content_mdx)
 
+        if cache and cache_key is not None:
+            _process_cache.put(cache_key, self._dump_result())
+
         return self
 
+    def _dump_result(self) -> ProcessedResult:
+        """导出处理结果（可变字段存为快照，调用方之后的修改不会影响缓存）"""
+        return ProcessedResult(
+            content_mdx=self.content_mdx,
+            reading_time=self.reading_time,
+            excerpt=self.excerpt,
+            snapshot=pickle.dumps(
+                (self.metadata, self.content_ast, self.toc),
+                protocol=pickle.HIGHEST_PROTOCOL,
+            ),
+        )
+
+    def _load_result(self, result: ProcessedResult) -> None:
+        """从缓存结果恢复字段（每次得到新对象，调用方的修改不会影响缓存）"""
+        self.metadata, self.content_ast, self.toc = result.restore()
+        self.content_mdx = result.content_mdx
+        self.reading_time = result.reading_time
+        self.excerpt = result.excerpt
+
     def _preprocess_math(self, content: str) -> str:
         """预处理数学公式：包裹在 HTML 标签中"""
         # 保护代码块
@@ -91,42 +428,35 @@ class PostProcessor:
             code_blocks.append(match.group(0))
             return f"<!--CODE_BLOCK_{len(code_blocks) - 1}-->"
 
-        content = re.sub(r"```.*?```", save_code, content, flags=re.DOTALL)
+        content = _CODE_BLOCK_RE.sub(save_code, content)
 
         # 块级公式
-        content = re.sub(
-            r"\$\$(.*?)\$\$",
-            r'<div class="math-block">\1</div>',
-            content,
-            flags=re.DOTALL,
-        )
+        content = _MATH_BLOCK_RE.sub(r'<div class="math-block">\1</div>', content)
 
         # 行内公式（移除 $ 符号）
         def replace_inline(match):
             latex = match.group(1)
-            if not re.search(r"[a-zA-Z\\]", latex):
+            if not _LATEX_HINT_RE.search(latex):
                 return match.group(0)
             return f'<span class="math-inline">{latex}</span>'
 
-        content = re.sub(r"(?<!\\)\$(\S[^$\n]*?\S)\$", replace_inline, content)
+        content = _MATH_INLINE_RE.sub(replace_inline, content)
 
-        # 还原代码块
-        for i, block in enumerate(code_blocks):
-            content = content.replace(f"<!--CODE_BLOCK_{i}-->", block)
+        # 还原代码块（一次扫描替换所有占位符）
+        if not code_blocks:
+            return content
 
-        return content
+        def restore_code(match):
+            index = int(match.group(1))
+            if index < len(code_blocks):
+                return code_blocks[index]
+            return match.group(0)
+
+        return _CODE_PLACEHOLDER_RE.sub(restore_code, content)
 
     def _is_jsx_syntax(self, content: str) -> bool:
         """检测是否是 JSX/TSX 语法"""
-        jsx_patterns = [
-            r"style=\{\{",  # style={{...}}
-            r"onClick=\{",  # onClick={...}
-            r"onChange=\{",  # onChange={...}
-            r"onSubmit=\{",  # onSubmit={...}
-            r"className=",  # className (JSX 特有，HTML 用 class)
-            r"=\{[^}]+\}",  # 任何属性={...}
-        ]
-        return any(re.search(pattern, content) for pattern in jsx_patterns)
+        return _is_jsx_syntax(content)
 
     async def _process_images(self, content: str) -> str:
         """解析并替换正文中的本地图片"""
@@ -142,13 +472,11 @@ class PostProcessor:
         if not self.session or not self.mdx_path:
             return content
 
-        # 匹配 Markdown 图片: ![alt](path)
-        img_pattern = r"!\[(.*?)\]\((.*?)\)"
-
         # 记录已处理的图片映射，避免同一篇文章重复处理同路径
         processed_map = {}
 
-        matches = re.findall(img_pattern, content)
+        # 匹配 Markdown 图片: ![alt](path)
+        matches = _IMAGE_RE.findall(content)
         if not matches:
             return content
 
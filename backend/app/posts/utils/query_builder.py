@@ -4,49 +4,31 @@
 提供文章、分类、标签的查询构建函数
 """
 
+import functools
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from app.posts.model import Post, PostSortOrder, PostStatus, PostType, Tag
-from sqlalchemy import String, cast, func
+from app.posts.model import Category, Post, PostSortOrder, PostStatus, PostType, Tag
+from sqlalchemy import DateTime, String, bindparam, cast, func
 from sqlalchemy.orm import load_only, selectinload
 from sqlmodel import desc, select
 
-
-def build_posts_query(
-    *,
-    post_type: Optional[PostType] = None,
-    status: Optional[PostStatus] = None,
-    category_id: Optional[UUID] = None,
-    tag_id: Optional[UUID] = None,
-    author_id: Optional[UUID] = None,
-    is_featured: Optional[bool] = None,
-    search_query: Optional[str] = None,
-    include_scheduled: bool = False,  # 🆕 是否包含定时发布的文章
-    sort_by: Optional["PostSortOrder"] = None,  # 🆕 排序方式
-):
-    """构建文章查询
-
-    Args:
-        post_type: 文章类型过滤
-        status: 状态过滤
-        category_id: 分类过滤
-        tag_id: 标签过滤
-        author_id: 作者过滤
-        is_featured: 是否推荐过滤
-        search_query: 搜索关键词
-        include_scheduled: 是否包含定时发布的文章（默认 False）
-            - False: 只显示 published_at <= 当前时间 的文章（公开接口默认）
-            - True: 显示所有文章，包括未来发布的（管理后台默认）
-        sort_by: 排序方式（默认为 PUBLISHED_AT_DESC）
-
-    定时发布逻辑：
-        - 文章状态为 PUBLISHED，但 published_at 是未来时间 → 不显示（除非 include_scheduled=True）
-        - 文章状态为 PUBLISHED，published_at 是过去时间 → 显示
-        - 文章状态为 DRAFT → 根据 status 参数决定是否显示
-    """
-    stmt = select(Post).options(
+# ========================================
+# 查询模板（首次使用时构建一次）
+# ========================================
+# Select 是不可变的生成式对象：每次 .where() / .order_by() 都返回新对象，
+# 模板本身不会被修改，可以安全地在所有请求间共享。
+# 各构建函数只在模板上追加随参数变化的过滤条件。
+#
+# 注意：不能在模块导入时直接构建——load_only 等选项会触发 mapper 配置，
+# 此时 MediaFile 等关联模型可能尚未导入，因此用 functools.cache 延迟到首次调用。
+
+
+@functools.cache
+def _posts_base():
+    """文章列表模板：只加载列表页需要的列（不含正文、AST 等大字段）+ 预加载关联"""
+    return select(Post).options(
         load_only(
             Post.id,
             Post.slug,
@@ -78,29 +60,22 @@ def build_posts_query(
         selectinload(Post.cover_media),
     )
 
-    if post_type:
-        stmt = stmt.where(Post.post_type == post_type)
-    if status:
-        stmt = stmt.where(Post.status == status)
-    if author_id:
-        stmt = stmt.where(Post.author_id == author_id)
-    if is_featured is not None:
-        stmt = stmt.where(Post.is_featured == is_featured)
-    if category_id:
-        stmt = stmt.where(Post.category_id == category_id)
-    if tag_id:
-        stmt = stmt.join(Post.tags).where(Tag.id == tag_id)
-    if search_query:
-        search_pattern = f"%{search_query}%"
-        stmt = stmt.where(
-            (Post.title.ilike(search_pattern)) | (Post.excerpt.ilike(search_pattern))
-        )
+
+@functools.cache
+def _posts_base_sorted(include_scheduled: bool, sort_by: Optional[PostSortOrder]):
+    """文章列表模板 + 定时发布过滤 + 排序，按 (include_scheduled, sort_by) 缓存
+
+    两个参数的取值组合有限（2 × 排序方式数），缓存不会无限增长；
+    分类、标签、搜索等取值不受限的过滤条件仍由 build_posts_query 每次追加。
+    """
+    stmt = _posts_base()
 
     # 🆕 定时发布过滤：只在公开接口生效（include_scheduled=False）
     if not include_scheduled:
         # 只显示已发布且发布时间 <= 当前时间的文章
         # 或者状态不是 PUBLISHED 的文章（草稿等，由 status 参数控制）
-        now = datetime.now()
+        # 当前时间用 callable_ 绑定参数：每次执行语句时才取值，模板可以缓存
+        now = bindparam("now", callable_=datetime.now, type_=DateTime)
         stmt = stmt.where(
             (Post.status != PostStatus.PUBLISHED)  # 草稿等状态不受限制
             | (Post.published_at.is_(None))  # 没有设置发布时间的文章
@@ -108,8 +83,6 @@ def build_posts_query(
         )
 
     # 处理排序
-    from app.posts.model import PostSortOrder
-
     if sort_by == PostSortOrder.PUBLISHED_AT_ASC:
         stmt = stmt.order_by(Post.published_at.asc(), Post.created_at.asc())
     elif sort_by == PostSortOrder.TITLE_ASC:
@@ -123,6 +96,81 @@ def build_posts_query(
     return stmt
 
 
+@functools.cache
+def _categories_base():
+    """分类列表模板：固定的排序和关联预加载"""
+    return (
+        select(Category)
+        .order_by(Category.sort_order.asc(), Category.name.asc())
+        .options(
+            selectinload(Category.parent),
+            selectinload(Category.icon),
+            selectinload(Category.cover_media),
+        )
+    )
+
+
+@functools.cache
+def _tags_base():
+    """标签列表模板：只列出有关联文章的标签（按内容类型再加过滤）"""
+    return select(Tag).join(Tag.posts).distinct().order_by(Tag.name.asc())
+
+
+def build_posts_query(
+    *,
+    post_type: Optional[PostType] = None,
+    status: Optional[PostStatus] = None,
+    category_id: Optional[UUID] = None,
+    tag_id: Optional[UUID] = None,
+    author_id: Optional[UUID] = None,
+    is_featured: Optional[bool] = None,
+    search_query: Optional[str] = None,
+    include_scheduled: bool = False,  # 🆕 是否包含定时发布的文章
+    sort_by: Optional["PostSortOrder"] = None,  # 🆕 排序方式
+):
+    """构建文章查询
+
+    Args:
+        post_type: 文章类型过滤
+        status: 状态过滤
+        category_id: 分类过滤
+        tag_id: 标签过滤
+        author_id: 作者过滤
+        is_featured: 是否推荐过滤
+        search_query: 搜索关键词
+        include_scheduled: 是否包含定时发布的文章（默认 False）
+            - False: 只显示 published_at <= 当前时间 的文章（公开接口默认）
+            - True: 显示所有文章，包括未来发布的（管理后台默认）
+        sort_by: 排序方式（默认为 PUBLISHED_AT_DESC）
+
+    定时发布逻辑：
+        - 文章状态为 PUBLISHED，但 published_at 是未来时间 → 不显示（除非 include_scheduled=True）
+        - 文章状态为 PUBLISHED，published_at 是过去时间 → 显示
+        - 文章状态为 DRAFT → 根据 status 参数决定是否显示
+    """
+    stmt = _posts_base_sorted(include_scheduled, sort_by)
+
+    if post_type:
+        stmt = stmt.where(Post.post_type == post_type)
+    if status:
+        stmt = stmt.where(Post.status == status)
+    if author_id:
+        stmt = stmt.where(Post.author_id == author_id)
+    if is_featured is not None:
+        stmt = stmt.where(Post.is_featured == is_featured)
+    if category_id:
+        stmt = stmt.where(Post.category_id == category_id)
+    if tag_id:
+        stmt = stmt.join(Post.tags).where(Tag.id == tag_id)
+    if search_query:
+        search_pattern = f"%{search_query}%"
+        stmt = stmt.where(
+            (Post.title.ilike(search_pattern)) | (Post.excerpt.ilike(search_pattern))
+        )
+
+    return stmt
+
+
 def build_categories_query(
     post_type: PostType,
     is_active: Optional[bool] = True,
@@ -138,18 +186,9 @@ def build_categories_query(
     Returns:
         查询语句
     """
-    from app.posts.model import Category
-
-    stmt = (
-        select(Category)
+    stmt = _categories_base().where(
         # 将 Enum 类型显式转换为字符串后再进行 lower() 比较
-        .where(func.lower(cast(Category.post_type, String)) == post_type.value.lower())
-        .order_by(Category.sort_order.asc(), Category.name.asc())
-        .options(
-            selectinload(Category.parent),
-            selectinload(Category.icon),
-            selectinload(Category.cover_media),
-        )
+        func.lower(cast(Category.post_type, String)) == post_type.value.lower()
     )
 
     if is_active is not None:
@@ -170,11 +209,4 @@ def build_tags_query(post_type: PostType):
     Returns:
         查询语句
     """
-    stmt = (
-        select(Tag)
-        .join(Tag.posts)
-        .where(Post.post_type == post_type)
-        .distinct()
-        .order_by(Tag.name.asc())
-    )
-    return stmt
+    return _tags_base().where(Post.post_type == post_type)
@@ -33,17 +33,17 @@ async def backfill_content_ast():
     """回填所有文章的 content_ast 字段"""
     async for session in get_session():
         try:
-            # 查询所有文章
-            stmt = select(Post)
-            result = await session.exec(stmt)
-            posts = result.all()
+            # 流式查询所有文章：服务端游标分批拉取，
+            # 避免一次性把全部文章（含正文、AST）载入内存
+            stmt = select(Post).execution_options(yield_per=100)
+            posts = await session.stream_scalars(stmt)
 
-            logger.info(f"找到 {len(posts)} 篇文章需要处理")
+            logger.info("开始处理文章")
 
             updated_count = 0
             skipped_count = 0
 
-            for post in posts:
+            async for post in posts:
                 # 如果已经有 content_ast，跳过
                 if post.content_ast:
                     logger.debug(f"跳过文章 {post.id} ({post.title})：已有 content_ast")
@@ -59,8 +59,10 @@ async def backfill_content_ast():
                     continue
 
                 try:
-                    # 处理内容生成 AST
-                    processor = PostProcessor(post.content_mdx).process()
+                    # 处理内容生成 AST（每篇只处理一次，不写入处理结果缓存）
+                    processor = await PostProcessor(post.content_mdx).process(
+                        cache=False
+                    )
                     post.content_ast = processor.content_ast
 
                     # 同时更新 TOC 和阅读时间（如果需要）
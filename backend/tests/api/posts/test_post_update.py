@@ -69,6 +69,48 @@ async def test_update_post_content(
     assert data["content_ast"] is not None  # 应该自动更新 AST
 
 
+@pytest.mark.asyncio
+@pytest.mark.posts
+async def test_update_post_reuses_processed_content(
+    async_client: AsyncClient,
+    normal_user_token_headers: dict,
+    test_post,
+    api_urls: APIConfig,
+):
+    """测试正文未变时复用处理结果：编辑器只改元数据再次保存、预览已保存的正文"""
+    from app.posts.utils import PostProcessor
+
+    url = f"{api_urls.API_PREFIX}/posts/articles/{test_post.id}"
+    content = "# 缓存复用\n\n保存后正文未变。"
+
+    PostProcessor.cache_clear()
+
+    first = await async_client.patch(
+        url, json={"content_mdx": content}, headers=normal_user_token_headers
+    )
+    assert first.status_code == status.HTTP_200_OK
+    assert PostProcessor.cache_info()["hits"] == 0
+
+    # 编辑器保存时总会带上完整正文：只改摘要，正文不变
+    second = await async_client.patch(
+        url,
+        json={"content_mdx": content, "excerpt": "只改摘要"},
+        headers=normal_user_token_headers,
+    )
+    assert second.status_code == status.HTTP_200_OK
+    assert PostProcessor.cache_info()["hits"] == 1
+    assert second.json()["content_ast"] == first.json()["content_ast"]
+
+    preview = await async_client.post(
+        f"{api_urls.API_PREFIX}/posts/preview",
+        json={"content_mdx": content},
+        headers=normal_user_token_headers,
+    )
+    assert preview.status_code == status.HTTP_200_OK
+    assert PostProcessor.cache_info()["hits"] == 2
+    assert preview.json()["content_ast"] == first.json()["content_ast"]
+
+
 @pytest.mark.asyncio
 @pytest.mark.posts
 async def test_update_post_status(
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from typing import AsyncGenerator
@@ -47,6 +48,22 @@ def setup_pagination():
     yield
 
 
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """测试事件循环策略：使用 uvloop（与 uvicorn[standard] 一致）
+
+    测试中大量短小的数据库 await，事件循环调度开销占比较高，
+    uvloop 可以降低这部分开销。uvloop 只随 uvicorn[standard] 间接安装，
+    Windows、PyPy 等环境没有它，此时保持默认策略。
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.get_event_loop_policy()
+
+    return uvloop.EventLoopPolicy()
+
+
 # ============================================================
 # 数据库 Fixtures
 # ============================================================
@@ -55,6 +72,11 @@ def setup_pagination():
 # pytest-asyncio 会根据 asyncio_default_fixture_loop_scope=session
 # 自动创建一个 session 级别的事件循环供所有测试共享
 
+# 注意：单元测试同样使用 PostgreSQL，而不是 sqlite 内存库
+# - 模型使用了 JSONB 等 PostgreSQL 专有类型，sqlite 无法建表
+# - session fixture 运行在外层事务 + savepoint 中，测试里的 commit()
+#   只释放 savepoint，不会触发真正的事务提交和磁盘刷写
+
 
 @pytest.fixture(scope="session")
 async def db_engine():
@@ -150,20 +150,15 @@ class TestThumbnailPathGeneration:
         user_id = uuid4()
         original_path = "uploads/2025/01/15_143022_123e4567e89b12d.jpg"
         sizes = ["small", "medium", "large", "xlarge"]
+        # 原文件名（不含扩展名）与尺寸无关，循环外计算一次
+        stem = Path(original_path).stem
 
         for size in sizes:
             thumbnail_path = generate_thumbnail_path(user_id, size, original_path)
 
-            # 验证路径包含正确的尺寸标识
+            # 验证文件名为：尺寸_原文件名.webp
             filename = Path(thumbnail_path).name
-            assert filename.startswith(f"{size}_"), (
-                f"缩略图文件名不包含尺寸标识: {filename}"
-            )
-
-            # 验证扩展名为 webp
-            assert thumbnail_path.endswith(".webp"), (
-                f"缩略图扩展名不正确: {thumbnail_path}"
-            )
+            assert filename == f"{size}_{stem}.webp", f"缩略图文件名不正确: {filename}"
 
     def test_generate_thumbnail_path_preserves_time_structure(self):
         """测试缩略图路径保持时间结构"""
@@ -8,13 +8,25 @@ import pytest
 from app.posts import cruds as posts_crud
 from app.posts.model import Category, Post, PostStatus, PostType
 from app.users.model import User, UserRole
+from sqlalchemy import insert
+
+
+async def make_posts(session, rows: list[dict]) -> list[Post]:
+    """批量插入文章并通过 RETURNING 取回 Post 对象（一次往返，无需 refresh）"""
+    result = await session.execute(insert(Post).returning(Post), rows)
+    return list(result.scalars().all())
 
 
-@pytest.mark.asyncio
 @pytest.mark.unit
 @pytest.mark.posts
 class TestPostsCrudGitOps:
-    """Posts CRUD Git Ops 相关函数测试"""
+    """Posts CRUD Git Ops 相关函数测试
+
+    fixtures 只 flush 不 commit：数据对当前测试可见，
+    测试结束时随 session fixture 的外层事务一起回滚。
+    session 使用 expire_on_commit=False，主键等字段在构造时已生成，
+    因此 fixtures 无需 refresh
+    """
 
     @pytest.fixture
     async def test_user(self, session):
@@ -26,8 +38,7 @@ class TestPostsCrudGitOps:
             role=UserRole.USER,
         )
         session.add(user)
-        await session.commit()
-        await session.refresh(user)
+        await session.flush()
         return user
 
     @pytest.fixture
@@ -39,74 +50,64 @@ class TestPostsCrudGitOps:
             post_type=PostType.ARTICLES,
         )
         session.add(category)
-        await session.commit()
-        await session.refresh(category)
+        await session.flush()
         return category
 
     @pytest.fixture
-    async def posts_with_source_path(self, session, test_user, test_category):
-        """创建带有 source_path 的文章"""
-        posts = []
-        for i in range(3):
-            post = Post(
-                title=f"Post {i}",
-                slug=f"post-{i}",
-                content_mdx=f"# Post {i}",
-                author_id=test_user.id,
-                category_id=test_category.id,
-                post_type=PostType.ARTICLES,
-                status=PostStatus.PUBLISHED,
-                source_path=f"articles/post-{i}.mdx",
-            )
-            session.add(post)
-            posts.append(post)
-        await session.commit()
-        for post in posts:
-            await session.refresh(post)
-        return posts
+    async def posts(self, request, session, test_user, test_category):
+        """按需创建文章，通过间接参数化传入 (同步文章数, 手动文章数)
+
+        同步文章带 source_path，手动文章不带，所有文章一条 INSERT 写入
+        """
+        n_synced, n_manual = request.param
+        specs = [
+            (f"Post {i}", f"post-{i}", f"articles/post-{i}.mdx")
+            for i in range(n_synced)
+        ] + [
+            (f"Manual Post {i}", f"manual-post-{i}", None)  # 没有 source_path
+            for i in range(n_manual)
+        ]
+        return await make_posts(
+            session,
+            [
+                {
+                    "title": title,
+                    "slug": slug,
+                    "content_mdx": f"# {title}",
+                    "author_id": test_user.id,
+                    "category_id": test_category.id,
+                    "post_type": PostType.ARTICLES,
+                    "status": PostStatus.PUBLISHED,
+                    "source_path": source_path,
+                }
+                for title, slug, source_path in specs
+            ],
+        )
 
     @pytest.fixture
-    async def posts_without_source_path(self, session, test_user, test_category):
-        """创建不带 source_path 的文章"""
-        posts = []
-        for i in range(2):
-            post = Post(
-                title=f"Manual Post {i}",
-                slug=f"manual-post-{i}",
-                content_mdx=f"# Manual Post {i}",
-                author_id=test_user.id,
-                category_id=test_category.id,
-                post_type=PostType.ARTICLES,
-                status=PostStatus.PUBLISHED,
-                source_path=None,  # 没有 source_path
-            )
-            session.add(post)
-            posts.append(post)
-        await session.commit()
-        for post in posts:
-            await session.refresh(post)
-        return posts
+    async def synced_result(self, session, posts):
+        """查询一次同步文章，供只读断言的测试共享
+
+        session 是函数级 fixture（每个测试回滚），所以这里同样是函数级
+        """
+        return await posts_crud.get_posts_with_source_path(session)
 
+    @pytest.mark.parametrize("posts", [(3, 2)], indirect=True)
     async def test_get_posts_with_source_path_returns_only_synced_posts(
-        self, session, posts_with_source_path, posts_without_source_path
+        self, session, posts
     ):
-        """测试只返回有 source_path 的文章"""
+        """测试混合场景：只返回有 source_path 的文章，排除手动创建的文章"""
         result = await posts_crud.get_posts_with_source_path(session)
 
         assert len(result) == 3
-        for post in result:
-            assert post.source_path is not None
-
-    async def test_get_posts_with_source_path_excludes_manual_posts(
-        self, session, posts_with_source_path, posts_without_source_path
-    ):
-        """测试排除手动创建的文章"""
-        result = await posts_crud.get_posts_with_source_path(session)
 
         # 验证没有手动创建的文章
-        slugs = [post.slug for post in result]
-        assert "manual-post-0" not in slugs
-        assert "manual-post-1" not in slugs
+        slugs = {post.slug for post in result}
+        assert slugs.isdisjoint({"manual-post-0", "manual-post-1"})
+
+        paths = [post.source_path for post in result]
+        assert None not in paths
+        assert all(path.startswith("articles/") for path in paths)
 
     async def test_get_posts_with_source_path_empty_result(self, session):
         """测试没有同步文章时返回空列表"""
@@ -115,46 +116,29 @@ class TestPostsCrudGitOps:
         assert result == []
         assert isinstance(result, list)
 
-    async def test_get_posts_with_source_path_returns_list(
-        self, session, posts_with_source_path
+    @pytest.mark.parametrize("posts", [(1, 0)], indirect=True)
+    async def test_get_posts_with_source_path_returns_complete_posts(
+        self, synced_result
     ):
-        """测试返回值是列表"""
-        result = await posts_crud.get_posts_with_source_path(session)
+        """测试返回值是文章列表，且文章数据和关系字段完整"""
+        assert isinstance(synced_result, list)
+        assert all(isinstance(post, Post) for post in synced_result)
 
-        assert isinstance(result, list)
-        assert all(isinstance(post, Post) for post in result)
-
-    async def test_get_posts_with_source_path_preserves_post_data(
-        self, session, posts_with_source_path
-    ):
-        """测试返回的文章数据完整"""
-        result = await posts_crud.get_posts_with_source_path(session)
-
-        post = result[0]
+        post = synced_result[0]
         assert post.title is not None
         assert post.slug is not None
         assert post.content_mdx is not None
+        assert post.source_path is not None
+        # 验证关系字段可以访问
         assert post.author_id is not None
         assert post.category_id is not None
-        assert post.source_path is not None
-
-    async def test_get_posts_with_source_path_with_mixed_posts(
-        self, session, posts_with_source_path, posts_without_source_path
-    ):
-        """测试混合场景：既有同步文章又有手动文章"""
-        result = await posts_crud.get_posts_with_source_path(session)
-
-        # 应该只返回同步文章
-        assert len(result) == 3
-        for post in result:
-            assert post.source_path is not None
-            assert post.source_path.startswith("articles/")
 
+    @pytest.mark.parametrize("posts", [(3, 0)], indirect=True)
     async def test_get_posts_with_source_path_multiple_calls_consistent(
-        self, session, posts_with_source_path
+        self, session, synced_result
     ):
         """测试多次调用结果一致"""
-        result1 = await posts_crud.get_posts_with_source_path(session)
+        result1 = synced_result
         result2 = await posts_crud.get_posts_with_source_path(session)
 
         assert len(result1) == len(result2)
@@ -209,30 +193,36 @@ class TestPostsCrudGitOps:
         # 这个测试验证行为的一致性
         assert isinstance(result, list)
 
+    @pytest.mark.slow
     async def test_get_posts_with_source_path_performance_with_many_posts(
         self, session, test_user, test_category
     ):
         """测试大量文章时的性能"""
-        # 创建 100 个文章
-        for i in range(100):
-            post = Post(
-                title=f"Post {i}",
-                slug=f"post-{i}",
-                content_mdx=f"# Post {i}",
-                author_id=test_user.id,
-                category_id=test_category.id,
-                post_type=PostType.ARTICLES,
-                status=PostStatus.PUBLISHED,
-                source_path=f"articles/post-{i}.mdx" if i % 2 == 0 else None,
-            )
-            session.add(post)
+        # 创建 100 个文章（Core 批量插入，一次往返完成）
+        # 过滤只关心 source_path，标题和正文无需区分，slug 才需要唯一
+        title = "Perf Post"
+        content = "# Perf Post"
+        rows = [
+            {
+                "title": title,
+                "slug": f"perf-post-{i}",
+                "content_mdx": content,
+                "author_id": test_user.id,
+                "category_id": test_category.id,
+                "post_type": PostType.ARTICLES,
+                "status": PostStatus.PUBLISHED,
+                "source_path": f"articles/post-{i}.mdx" if i % 2 == 0 else None,
+            }
+            for i in range(100)
+        ]
+        await session.execute(insert(Post), rows)
         await session.commit()
 
         result = await posts_crud.get_posts_with_source_path(session)
 
         # 应该返回 50 个有 source_path 的文章
         assert len(result) == 50
-        assert all(post.source_path is not None for post in result)
+        assert None not in {post.source_path for post in result}
 
     async def test_get_posts_with_source_path_different_source_paths(
         self, session, test_user, test_category
@@ -245,18 +235,22 @@ class TestPostsCrudGitOps:
             "docs/guide.mdx",
         ]
 
-        for i, path in enumerate(paths):
-            post = Post(
-                title=f"Post {i}",
-                slug=f"post-{i}",
-                content_mdx=f"# Post {i}",
-                author_id=test_user.id,
-                category_id=test_category.id,
-                post_type=PostType.ARTICLES,
-                status=PostStatus.PUBLISHED,
-                source_path=path,
-            )
-            session.add(post)
+        await session.execute(
+            insert(Post),
+            [
+                {
+                    "title": f"Post {i}",
+                    "slug": f"post-{i}",
+                    "content_mdx": f"# Post {i}",
+                    "author_id": test_user.id,
+                    "category_id": test_category.id,
+                    "post_type": PostType.ARTICLES,
+                    "status": PostStatus.PUBLISHED,
+                    "source_path": path,
+                }
+                for i, path in enumerate(paths)
+            ],
+        )
         await session.commit()
 
         result = await posts_crud.get_posts_with_source_path(session)
@@ -264,14 +258,3 @@ class TestPostsCrudGitOps:
         assert len(result) == 4
         returned_paths = {post.source_path for post in result}
         assert returned_paths == set(paths)
-
-    async def test_get_posts_with_source_path_preserves_relationships(
-        self, session, posts_with_source_path
-    ):
-        """测试返回的文章保留关系字段"""
-        result = await posts_crud.get_posts_with_source_path(session)
-
-        post = result[0]
-        # 验证关系字段可以访问
-        assert post.author_id is not None
-        assert post.category_id is not None
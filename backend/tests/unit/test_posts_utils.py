@@ -6,7 +6,7 @@ import pytest
 """
 
 import re
-from uuid import uuid4
+from uuid import UUID
 
 # 导入所有相关模型，确保 SQLAlchemy 能正确初始化模型映射关系
 from app.media.model import MediaFile  # noqa: F401
@@ -19,88 +19,42 @@ from app.posts.utils import (
 )
 from app.users.model import User  # noqa: F401
 
+# 只作为过滤参数使用的固定 ID（不需要真实存在）
+_CATEGORY_ID = UUID(int=1)
+_TAG_ID = UUID(int=2)
+_AUTHOR_ID = UUID(int=3)
+
+# slug 校验正则：随机后缀只含小写字母和数字，完整 slug 额外允许连字符
+_SUFFIX_RE = re.compile(r"^[a-z0-9]+$", re.ASCII)
+_SLUG_RE = re.compile(r"^[a-z0-9-]*$", re.ASCII)
+
 # ============================================================================
 # 文章查询构建测试
 # ============================================================================
 
 
+@pytest.mark.parametrize(
+    "filters,expected",
+    [
+        # 不带任何过滤条件：默认包含状态相关条件（定时发布过滤）
+        ({}, "posts_post.status"),
+        ({"post_type": PostType.ARTICLES}, "posts_post.post_type"),
+        ({"status": PostStatus.DRAFT}, "posts_post.status"),
+        ({"category_id": _CATEGORY_ID}, "posts_post.category_id"),
+        # 按标签过滤需要 JOIN 标签表
+        ({"tag_id": _TAG_ID}, "posts_tag"),
+        ({"author_id": _AUTHOR_ID}, "posts_post.author_id"),
+        ({"is_featured": True}, "posts_post.is_featured"),
+        # 搜索使用 LIKE / ILIKE
+        ({"search_query": "测试"}, "LIKE"),
+    ],
+)
 @pytest.mark.asyncio
-async def test_build_posts_query_no_filters():
-    """测试不带任何过滤条件的查询"""
-    query = build_posts_query()
-
-    # 验证查询对象被创建
-    assert query is not None
-    # 验证默认状态过滤为 PUBLISHED
-    assert "posts_post.status" in str(query)
-
-
-@pytest.mark.asyncio
-async def test_build_posts_query_with_post_type():
-    """测试按文章类型过滤"""
-    query = build_posts_query(post_type=PostType.ARTICLES)
-
-    query_str = str(query)
-    assert "posts_post.post_type" in query_str
-
-
-@pytest.mark.asyncio
-async def test_build_posts_query_with_status():
-    """测试按状态过滤"""
-    query = build_posts_query(status=PostStatus.DRAFT)
-
-    query_str = str(query)
-    assert "posts_post.status" in query_str
-
-
-@pytest.mark.asyncio
-async def test_build_posts_query_with_category():
-    """测试按分类过滤"""
-    category_id = uuid4()
-    query = build_posts_query(category_id=category_id)
-
-    query_str = str(query)
-    assert "posts_post.category_id" in query_str
-
-
-@pytest.mark.asyncio
-async def test_build_posts_query_with_tag():
-    """测试按标签过滤"""
-    tag_id = uuid4()
-    query = build_posts_query(tag_id=tag_id)
-
-    query_str = str(query)
-    # 应该包含 JOIN 标签表
-    assert "posts_tag" in query_str or "JOIN" in query_str
-
-
-@pytest.mark.asyncio
-async def test_build_posts_query_with_author():
-    """测试按作者过滤"""
-    author_id = uuid4()
-    query = build_posts_query(author_id=author_id)
-
-    query_str = str(query)
-    assert "posts_post.author_id" in query_str
-
-
-@pytest.mark.asyncio
-async def test_build_posts_query_with_featured():
-    """测试按推荐状态过滤"""
-    query = build_posts_query(is_featured=True)
-
-    query_str = str(query)
-    assert "posts_post.is_featured" in query_str
-
-
-@pytest.mark.asyncio
-async def test_build_posts_query_with_search():
-    """测试搜索功能"""
-    query = build_posts_query(search_query="测试")
+async def test_build_posts_query_filters(filters, expected):
+    """参数化测试：每个过滤条件都出现在生成的 SQL 中"""
+    query_str = str(build_posts_query(**filters))
 
-    query_str = str(query)
-    # 应该包含 LIKE 或 ILIKE 查询
-    assert "LIKE" in query_str.upper() or "ILIKE" in query_str.upper()
+    assert expected in query_str
 
 
 @pytest.mark.asyncio
@@ -114,9 +68,12 @@ async def test_build_posts_query_with_multiple_filters():
     )
 
     query_str = str(query)
-    assert "posts_post.post_type" in query_str
-    assert "posts_post.status" in query_str
-    assert "posts_post.is_featured" in query_str
+    for column in (
+        "posts_post.post_type",
+        "posts_post.status",
+        "posts_post.is_featured",
+    ):
+        assert column in query_str
 
 
 @pytest.mark.asyncio
@@ -124,7 +81,6 @@ async def test_build_posts_query_includes_relationships():
     """测试查询包含关联数据加载"""
     query = build_posts_query()
 
-    query_str = str(query)
     # 验证使用了 selectinload（通过检查查询字符串）
     # 注意：这个测试可能需要根据实际 SQLAlchemy 版本调整
     assert query is not None
@@ -133,10 +89,10 @@ async def test_build_posts_query_includes_relationships():
 @pytest.mark.asyncio
 async def test_build_posts_query_ordering():
     """测试查询排序"""
-    query = build_posts_query()
+    query_str = str(build_posts_query())
 
     # 应该按发布时间和创建时间降序排列
-    assert "ORDER BY" in str(query) or "order_by" in str(query)
+    assert "ORDER BY" in query_str
 
 
 # ============================================================================
@@ -180,7 +136,7 @@ async def test_build_categories_query_ordering():
 
     query_str = str(query)
     # 应该按 sort_order 和 name 排序
-    assert "ORDER BY" in query_str or "order_by" in str(query)
+    assert "ORDER BY" in query_str
 
 
 @pytest.mark.asyncio
@@ -240,10 +196,10 @@ async def test_build_tags_query_distinct():
 @pytest.mark.asyncio
 async def test_build_tags_query_ordering():
     """测试标签查询排序"""
-    query = build_tags_query(PostType.ARTICLES)
+    query_str = str(build_tags_query(PostType.ARTICLES))
 
     # 应该按标签名称排序
-    assert "ORDER BY" in str(query) or "order_by" in str(query)
+    assert "ORDER BY" in query_str
 
 
 # ============================================================================
@@ -251,82 +207,68 @@ async def test_build_tags_query_ordering():
 # ============================================================================
 
 
+@pytest.mark.parametrize(
+    "title,random_length,expected_prefix",
+    [
+        ("Hello World", 6, "hello-world-"),
+        # 中文标题会被转写，只校验格式
+        ("我的第一篇文章", 6, None),
+        # 空标题使用默认值
+        ("", 6, "post-"),
+        # 特殊字符应该被移除或转换
+        ("Hello & World! @#$%", 6, "hello-world-"),
+        ("Test", 8, "test-"),
+        # 不应该产生连续的连字符
+        ("A---B", 6, "a-b-"),
+        ("HELLO WORLD ABC", 6, "hello-world-abc-"),
+    ],
+    ids=[
+        "basic",
+        "chinese",
+        "empty_title",
+        "special_characters",
+        "custom_random_length",
+        "no_double_hyphen",
+        "lowercase",
+    ],
+)
 @pytest.mark.asyncio
-async def test_generate_slug_basic():
-    """测试基础 slug 生成"""
-    slug = generate_slug_with_random_suffix("Hello World")
+async def test_generate_slug(title, random_length, expected_prefix):
+    """参数化测试：slug 格式、前缀和随机后缀长度"""
+    slug = generate_slug_with_random_suffix(title, random_length=random_length)
 
-    # 应该以 "hello-world-" 开头
-    assert slug.startswith("hello-world-"), (
-        f"Expected slug to start with 'hello-world-', got {slug}"
-    )
+    if expected_prefix is not None:
+        assert slug.startswith(expected_prefix), (
+            f"Expected slug to start with {expected_prefix!r}, got {slug}"
+        )
 
-    # 应该有 6 位随机后缀
-    suffix = slug.split("-")[-1]
-    assert len(suffix) == 6, f"Expected suffix length 6, got {len(suffix)}"
+    # 整个 slug 只包含小写字母、数字和连字符
+    assert _SLUG_RE.match(slug), f"Slug contains invalid characters: {slug}"
 
-    # 随机后缀应该只包含小写字母和数字
-    assert re.match(r"^[a-z0-9]+$", suffix), (
-        f"Suffix contains invalid characters: {suffix}"
+    base, _, suffix = slug.rpartition("-")
+    assert len(suffix) == random_length, (
+        f"Expected suffix length {random_length}, got {len(suffix)}"
     )
-
-
-@pytest.mark.asyncio
-async def test_generate_slug_chinese():
-    """测试中文标题的 slug 生成"""
-    slug = generate_slug_with_random_suffix("我的第一篇文章")
-
-    # 应该有随机后缀
-    suffix = slug.split("-")[-1]
-    assert len(suffix) == 6, f"Expected suffix length 6, got {len(suffix)}"
-    assert re.match(r"^[a-z0-9]+$", suffix)
-
-
-@pytest.mark.asyncio
-async def test_generate_slug_empty_title():
-    """测试空标题时使用默认值"""
-    slug = generate_slug_with_random_suffix("")
-
-    # 应该以 "post-" 开头
-    assert slug.startswith("post-"), f"Expected slug to start with 'post-', got {slug}"
-
-    suffix = slug.split("-")[-1]
-    assert len(suffix) == 6
-
-
-@pytest.mark.asyncio
-async def test_generate_slug_special_characters():
-    """测试特殊字符的处理"""
-    slug = generate_slug_with_random_suffix("Hello & World! @#$%")
-
-    # 特殊字符应该被移除或转换
-    suffix = slug.split("-")[-1]
-    assert len(suffix) == 6
-    assert re.match(r"^[a-z0-9-]*$", slug), f"Slug contains invalid characters: {slug}"
-
-
-@pytest.mark.asyncio
-async def test_generate_slug_custom_random_length():
-    """测试自定义随机后缀长度"""
-    slug = generate_slug_with_random_suffix("Test", random_length=8)
-
-    suffix = slug.split("-")[-1]
-    assert len(suffix) == 8, f"Expected suffix length 8, got {len(suffix)}"
+    assert _SUFFIX_RE.match(suffix), f"Suffix contains invalid characters: {suffix}"
+    # 不应该有连续的连字符（除了 base 和 suffix 之间的）
+    assert "--" not in base, f"Slug should not have double hyphens: {slug}"
 
 
 @pytest.mark.asyncio
 async def test_generate_slug_uniqueness():
     """测试随机性：多次调用应该生成不同的 slug"""
     title = "Test Article"
-    slugs = [generate_slug_with_random_suffix(title) for _ in range(100)]
-
-    # 所有 slug 应该是唯一的（冲突概率极低）
-    unique_slugs = set(slugs)
-    assert len(unique_slugs) == len(slugs), "Generated duplicate slugs"
+    slugs = set()
+    bases = set()
+    for _ in range(100):
+        slug = generate_slug_with_random_suffix(title)
+        # 所有 slug 应该是唯一的（冲突概率极低）
+        assert slug not in slugs, f"Generated duplicate slug: {slug}"
+        slugs.add(slug)
+        bases.add(slug.rpartition("-")[0])
 
     # 但基础部分应该相同
-    base_parts = [slug.rsplit("-", 1)[0] for slug in slugs]
-    assert len(set(base_parts)) == 1, "Base slug should be the same"
+    assert len(bases) == 1, f"Base slug should be the same: {bases}"
 
 
 @pytest.mark.asyncio
@@ -336,8 +278,8 @@ async def test_generate_slug_consistency_with_same_title():
     slug2 = generate_slug_with_random_suffix("My First Post")
 
     # 提取 base slug （去掉随机后缀）
-    base1 = slug1.rsplit("-", 1)[0]
-    base2 = slug2.rsplit("-", 1)[0]
+    base1 = slug1.rpartition("-")[0]
+    base2 = slug2.rpartition("-")[0]
 
     assert base1 == base2, f"Base slugs should match: {base1} vs {base2}"
 
@@ -345,25 +287,6 @@ async def test_generate_slug_consistency_with_same_title():
     assert slug1 != slug2, "Complete slugs should be different due to random suffix"
 
 
-@pytest.mark.asyncio
-async def test_generate_slug_no_double_hyphen():
-    """测试不应该产生连续的连字符"""
-    slug = generate_slug_with_random_suffix("A---B")
-
-    # 不应该有连续的连字符（除了 base 和 suffix 之间的）
-    assert "--" not in slug.replace("-" + slug.split("-")[-1], ""), (
-        f"Slug should not have double hyphens: {slug}"
-    )
-
-
-@pytest.mark.asyncio
-async def test_generate_slug_lowercase():
-    """测试 slug 应该全小写"""
-    slug = generate_slug_with_random_suffix("HELLO WORLD ABC")
-
-    assert slug == slug.lower(), f"Slug should be lowercase: {slug}"
-
-
 # ============================================================================
 # PostProcessor 测试
 # ============================================================================
@@ -451,6 +374,36 @@ title: Test
     assert processor.toc[1]["title"] == "另一个真实标题"
 
 
+@pytest.mark.asyncio
+async def test_post_processor_toc_ignores_tilde_code_blocks():
+    """测试 TOC 生成忽略 ~~~ 代码块，且不同围栏标记互不闭合"""
+    from app.posts.utils import PostProcessor
+
+    content = """---
+title: Test
+---
+
+## 真实标题
+
+~~~markdown
+## 波浪线代码块中的标题
+```
+## 仍在代码块中
+~~~
+
+####### 不是标题
+
+#不是标题
+
+## 另一个真实标题
+"""
+
+    processor = PostProcessor(content)
+    await processor.process()
+
+    assert [item["title"] for item in processor.toc] == ["真实标题", "另一个真实标题"]
+
+
 @pytest.mark.asyncio
 async def test_post_processor_heading_ids_with_special_chars():
     """测试特殊字符标题的 ID 生成"""
@@ -518,3 +471,132 @@ title: Test
 
     assert "这是第一段内容" in processor.excerpt
     assert len(processor.excerpt) <= 203  # 200 + "..."
+
+
+@pytest.mark.asyncio
+async def test_post_processor_reuses_cached_result():
+    """测试相同内容第二次处理命中缓存，且结果互不影响"""
+    from app.posts.utils import PostProcessor
+
+    content = """---
+title: Cache
+---
+
+## 缓存标题
+
+缓存测试内容。
+"""
+
+    PostProcessor.cache_clear()
+
+    first = await PostProcessor(content).process()
+    second = await PostProcessor(content).process()
+
+    info = PostProcessor.cache_info()
+    assert info["misses"] == 1
+    assert info["hits"] == 1
+
+    assert second.metadata == first.metadata
+    assert second.toc == first.toc
+    assert second.content_ast == first.content_ast
+    assert second.excerpt == first.excerpt
+
+    # 修改一次的结果不应影响缓存中的数据
+    first.toc.clear()
+    third = await PostProcessor(content).process()
+    assert third.toc == second.toc
+
+
+@pytest.mark.asyncio
+async def test_post_processor_toc_ids_match_ast_heading_ids():
+    """测试 TOC 与 AST 的标题 id 使用同一套 slug 规则（含重复和无效标题）"""
+    from app.posts.utils import PostProcessor
+    from app.posts.utils.content_parser import heading_slug
+
+    content = "# Hello World\n\n## Hello World\n\n## ！！！\n\n### Hello--World"
+    processor = await PostProcessor(content).process(cache=False)
+
+    def heading_ids(node):
+        if node.get("type") == "heading":
+            yield node["id"]
+        for child in node.get("children") or []:
+            yield from heading_ids(child)
+
+    toc_ids = [item["id"] for item in processor.toc]
+    assert toc_ids == ["hello-world", "hello-world-1", "heading", "hello-world-2"]
+    assert list(heading_ids(processor.content_ast)) == toc_ids
+    assert heading_slug("  C++ / Python  ") == "c-python"
+
+
+@pytest.mark.asyncio
+async def test_post_processor_cache_false_does_not_store():
+    """测试 cache=False（实时预览）只查缓存，不写入新结果"""
+    from app.posts.utils import PostProcessor
+
+    PostProcessor.cache_clear()
+
+    await PostProcessor("## 预览内容").process(cache=False)
+    assert PostProcessor.cache_info()["size"] == 0
+
+    # 已缓存的相同内容仍然可以命中
+    await PostProcessor("## 已同步内容").process()
+    await PostProcessor("## 已同步内容").process(cache=False)
+    info = PostProcessor.cache_info()
+    assert info["size"] == 1
+    assert info["hits"] == 1
+
+
+def test_process_cache_bounded_by_bytes():
+    """测试处理结果缓存按总大小淘汰最久未使用的条目"""
+    from app.posts.utils.processor import ProcessedResult, _ProcessCache
+
+    cache = _ProcessCache(maxsize=100, maxbytes=250)
+    entry = ProcessedResult(
+        content_mdx="", reading_time=1, excerpt="", snapshot=b"x" * 100
+    )
+
+    cache.put(b"a", entry)
+    cache.put(b"b", entry)
+    cache.put(b"c", entry)
+
+    assert cache.get(b"a") is None
+    assert cache.get(b"c") is entry
+    assert cache.info()["bytes"] == 200
+
+    # 单个条目超过上限时不缓存
+    cache.put(b"big", ProcessedResult("", 1, "", b"x" * 300))
+    assert cache.get(b"big") is None
+    assert cache.info()["size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_post_processor_frontmatter_matches_yaml():
+    """测试 Frontmatter 快速解析与 python-frontmatter 结果一致（含回退场景）"""
+    import frontmatter
+    from app.posts.utils import PostProcessor
+
+    simple = """title: 简单标题
+summary: Hello World
+tags:
+  - Python
+  - FastAPI
+category:"""
+    # 日期、数字、布尔、引号等需要回退到 YAML 解析器
+    complex_ = """title: "带: 冒号"
+date: 2024-01-01
+order: 3
+is_featured: true
+tags: [a, b]"""
+    # 位于末尾的块标量保留结尾换行
+    literal = "summary: |\n  line1\n  line2"
+    folded = "summary: >\n  line1\n  line2"
+    # 只含制表符、全角空格的行不是空行：YAML 会把它续接到上一个普通标量
+    unicode_blank = "a_b: $$\n \t\u3000 \nx: y"
+
+    for fm in (simple, complex_, literal, folded, unicode_blank):
+        raw = f"---\n{fm}\n---\n\n正文内容\n"
+        processor = PostProcessor(raw)
+        await processor.process()
+
+        assert processor.metadata == frontmatter.loads(raw).metadata
+        assert processor.content_mdx == "正文内容"
@@ -1,38 +1,53 @@
+from datetime import datetime
+
 import pytest
-from app.posts.model import PostSortOrder
+from app.posts.model import Post, PostSortOrder
 from app.posts.utils import build_posts_query
 
 
-@pytest.mark.asyncio
-async def test_build_posts_query_with_sort_by():
-    """测试排序功能"""
-
-    # 测试发布时间倒序
-    query_pub_desc = build_posts_query(sort_by=PostSortOrder.PUBLISHED_AT_DESC)
-    # 检查 SQL 中是否包含 ORDER BY
-    assert "ORDER BY" in str(query_pub_desc)
-
-    # 测试标题正序
-    query_title_asc = build_posts_query(sort_by=PostSortOrder.TITLE_ASC)
-    str_query = str(query_title_asc)
-    # 检查 SQL 中是否包含 title 排序
-    assert (
-        "posts_post.title ASC" in str_query
-        or "posts_post.title" in str_query
-        and "ASC" in str_query
-    )
-
-    # 测试标题倒序
-    query_title_desc = build_posts_query(sort_by=PostSortOrder.TITLE_DESC)
-    str_query = str(query_title_desc)
-    assert (
-        "posts_post.title DESC" in str_query
-        or "posts_post.title" in str_query
-        and "DESC" in str_query
-    )
-
-
-@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sort_by,expected",
+    [
+        (None, (Post.published_at.desc(), Post.created_at.desc())),
+        (
+            PostSortOrder.PUBLISHED_AT_DESC,
+            (Post.published_at.desc(), Post.created_at.desc()),
+        ),
+        (
+            PostSortOrder.PUBLISHED_AT_ASC,
+            (Post.published_at.asc(), Post.created_at.asc()),
+        ),
+        (PostSortOrder.TITLE_ASC, (Post.title.asc(),)),
+        (PostSortOrder.TITLE_DESC, (Post.title.desc(),)),
+    ],
+)
+async def test_build_posts_query_with_sort_by(sort_by, expected):
+    """测试排序功能：直接比较 ORDER BY 子句结构，无需把查询编译成 SQL 字符串"""
+    clauses = build_posts_query(sort_by=sort_by)._order_by_clauses
+
+    assert len(clauses) == len(expected)
+    for clause, expected_clause in zip(clauses, expected):
+        assert clause.compare(expected_clause), f"{sort_by}: {clause}"
+
+
+async def test_build_posts_query_cache_key_stable():
+    """测试相同参数构建的查询共享 SQLAlchemy 编译缓存键
+
+    datetime.now() 等取值只作为绑定参数，不进入缓存键，
+    因此重复请求可以直接复用已编译的 SQL；不同排序方式的缓存键不同。
+    """
+    keys = {}
+    for sort_by in PostSortOrder:
+        first = build_posts_query(sort_by=sort_by)._generate_cache_key()
+        second = build_posts_query(sort_by=sort_by)._generate_cache_key()
+
+        assert first is not None, f"{sort_by} query is not cacheable"
+        assert first == second, f"{sort_by} query cache key is not stable"
+        keys[sort_by] = first.key
+
+    assert len(set(keys.values())) == len(keys)
+
+
 async def test_build_posts_query_include_scheduled():
     """测试定时发布包含"""
     # 默认不包含 (include_scheduled=False)
@@ -44,3 +59,12 @@ async def test_build_posts_query_include_scheduled():
     query_include = build_posts_query(include_scheduled=True)
     # 不应该包含时间过滤
     assert "posts_post.published_at <=" not in str(query_include)
+
+
+def test_build_posts_query_scheduled_now_not_frozen():
+    """测试查询模板被缓存后，定时发布过滤的当前时间仍在每次执行时取值"""
+    now_param = build_posts_query().compile().binds["now"]
+
+    # 绑定的是函数本身而不是某一时刻的值（classmethod 每次取属性得到新对象，用 ==）
+    assert now_param.value is None
+    assert now_param.callable == datetime.now
@@ -8,11 +8,11 @@
 import pytest
 from app.posts.cruds.tag import get_or_create_tag
 from app.posts.model import Tag
-from sqlmodel import select
+from sqlmodel import func, select
+
+pytestmark = [pytest.mark.unit, pytest.mark.posts]
 
 
-@pytest.mark.unit
-@pytest.mark.posts
 async def test_get_or_create_tag_by_exact_match(session):
     """测试：完全匹配的标签名和 slug 应返回现有标签"""
     # 创建初始标签
@@ -27,8 +27,6 @@ async def test_get_or_create_tag_by_exact_match(session):
     assert tag1.slug == tag2.slug == "python"
 
 
-@pytest.mark.unit
-@pytest.mark.posts
 async def test_get_or_create_tag_by_slug_match(session):
     """测试：slug 匹配但 name 不同时，应返回现有标签（防止 slug 冲突）"""
     # 创建初始标签
@@ -43,14 +41,10 @@ async def test_get_or_create_tag_by_slug_match(session):
     # 应该返回已存在的标签，而不是创建新的
 
     # 验证数据库中只有一个 slug="python" 的标签
-    stmt = select(Tag).where(Tag.slug == "python")
-    result = await session.exec(stmt)
-    tags = result.all()
-    assert len(tags) == 1
+    stmt = select(func.count()).select_from(Tag).where(Tag.slug == "python")
+    assert (await session.exec(stmt)).one() == 1
 
 
-@pytest.mark.unit
-@pytest.mark.posts
 async def test_get_or_create_tag_by_name_match(session):
     """测试：name 匹配但 slug 不同时，应返回现有标签"""
     # 创建初始标签
@@ -64,8 +58,6 @@ async def test_get_or_create_tag_by_name_match(session):
     assert tag1.id == tag2.id
 
 
-@pytest.mark.unit
-@pytest.mark.posts
 async def test_get_or_create_tag_creates_new_when_no_match(session):
     """测试：name 和 slug 都不匹配时，应创建新标签"""
     tag1 = await get_or_create_tag(session, name="React", slug="react")
@@ -77,14 +69,10 @@ async def test_get_or_create_tag_creates_new_when_no_match(session):
     assert tag2.name == "Vue"
 
     # 验证数据库中有两个不同的标签
-    stmt = select(Tag)
-    result = await session.exec(stmt)
-    tags = result.all()
-    assert len(tags) == 2
+    stmt = select(func.count()).select_from(Tag)
+    assert (await session.exec(stmt)).one() == 2
 
 
-@pytest.mark.unit
-@pytest.mark.posts
 async def test_get_or_create_tag_case_insensitive_slug(session):
     """测试：slug 的大小写敏感性处理"""
     # 创建标签（通常 slug 会被 slugify 转为小写）
@@ -98,7 +86,5 @@ async def test_get_or_create_tag_case_insensitive_slug(session):
     assert tag1.id == tag2.id
 
     # 验证数据库中只有一个标签
-    stmt = select(Tag)
-    result = await session.exec(stmt)
-    tags = result.all()
-    assert len(tags) == 1
+    stmt = select(func.count()).select_from(Tag)
+    assert (await session.exec(stmt)).one() == 1